@@ -4,50 +4,127 @@ Scrapes cinema websites for special events (Q&As, 35mm screenings, etc.)
 """
 
 import os
+import argparse
+import asyncio
+import functools
+import hashlib
 import json
 import re
+import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
-from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-from firecrawl import Firecrawl
-from openai import OpenAI
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+import jiter
+import msgspec
+from dotenv import find_dotenv, load_dotenv
+from models import (
+    EVENTS_DECODER,
+    EVENTS_RESPONSE_DECODER,
+    EVENTS_RESPONSE_FORMAT,
+    EVENTS_RESPONSE_SCHEMA,
+    EventsResponse,
+    ScreeningEvent,
+)
+
+# openai, supabase and firecrawl each pull in hundreds of modules, so they are
+# imported where first used (after API keys have been checked)
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
+    from supabase import Client
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop is POSIX-only and optional; the default asyncio loop works too
+    uvloop = None  # type: ignore[assignment]
+
+
+def debug_enabled() -> bool:
+    """Whether verbose diagnostics are on (DEBUG=1 in the environment or .env)."""
+    return os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
 
 
 # Load environment variables with smart path finding
-def load_env_file():
-    """Load .env file from current directory or parent directory."""
-    current_dir = Path(__file__).parent
-    parent_dir = current_dir.parent
+@functools.lru_cache(maxsize=1)
+def load_env_file() -> bool:
+    """
+    Load .env file from current directory or parent directory.
     
-    # Try current directory first
-    current_env = current_dir / '.env'
-    parent_env = parent_dir / '.env'
+    Cached, so repeated calls (e.g. from load_config) do not stat the files again.
     
-    env_path = None
-    if current_env.exists():
-        env_path = current_env
-    elif parent_env.exists():
-        env_path = parent_env
+    Returns:
+        True if a .env file was found and loaded
+    """
+    here = Path(__file__).parent
+    # Try current directory first
+    candidates = (here / '.env', here.parent / '.env')
+    env_path = next((path for path in candidates if path.is_file()), None)
     
     if env_path:
-        print(f"Looking for .env at: {env_path}")
-        load_dotenv(dotenv_path=env_path)
+        load_dotenv(dotenv_path=env_path, override=False)
+        # Checked after loading so DEBUG=1 in the .env file itself also works
+        if debug_enabled():
+            print(f"Loaded .env from: {env_path}")
         return True
-    else:
-        print(f"⚠️  No .env file found in:")
-        print(f"   - {current_env}")
-        print(f"   - {parent_env}")
-        # Still try to load (might be in environment already)
-        load_dotenv()
-        return False
+    
+    # Still try to load (might be in environment already). Search from the
+    # working directory: the default caller-frame lookup breaks under mypyc.
+    load_dotenv(find_dotenv(usecwd=True))
+    if debug_enabled():
+        print("⚠️  No .env file found in:")
+        for path in candidates:
+            print(f"   - {path}")
+    return False
 
 load_env_file()
 
+# Verbose diagnostics (set DEBUG=1 in the environment or .env)
+DEBUG = debug_enabled()
+
 # Theater name constant
 THEATER_NAME = "Metrograph"
 
+# Theaters to scrape: (theater name, Special Events page URL)
+THEATERS = [
+    (THEATER_NAME, "https://metrograph.com/events/"),
+]
+
+# Max theaters scraped/analyzed at once (keeps us under Firecrawl rate limits)
+MAX_CONCURRENCY = 5
+
+# Max rows per Supabase upsert request
+SUPABASE_UPSERT_BATCH_SIZE = 500
+
+# Unique key of scraping_events rows (the upsert's on_conflict columns). date
+# is part of it so repeat screenings of a film on other days are kept.
+SUPABASE_CONFLICT_COLUMNS = ("film_title", "date", "showtime", "theater_name")
+
+# Rows buffered from the OpenAI stream before each Supabase upsert
+SUPABASE_STREAM_BATCH_SIZE = 100
+
+# Firecrawl Document attributes that may hold the page markdown, in priority order
+MARKDOWN_ACCESSORS = ("markdown", "content")
+
+# OpenAI model and prompt version (bump PROMPT_VERSION when the prompt changes
+# so cached results from the old prompt are not reused)
+OPENAI_MODEL = "gpt-4o-mini"
+PROMPT_VERSION = "3"
+
+# Model used only to convert the extracted text into JSON. Kept separate from
+# OPENAI_MODEL so this mechanical stage can be pointed at a cheaper model.
+FORMATTER_MODEL = "gpt-4o-mini"
+
+# Lines worth sending to the LLM: showtimes and special-event markers.
+# Each match also keeps PREFILTER_CONTEXT_LINES lines on either side.
+PREFILTER_LINE_RE = re.compile(r"(\d{1,2}:\d{2}\s?[AP]M|Q&A|35mm|70mm|Premiere|Director)", re.IGNORECASE)
+PREFILTER_CONTEXT_LINES = 3
+
+# On-disk cache of LLM results, keyed by a hash of the scraped markdown
+LLM_CACHE_DIR = Path(__file__).parent / ".cache" / "llm"
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+
 
 def get_api_key(key_name: str, fallback_key_name: Optional[str] = None) -> str:
     """
@@ -80,56 +157,166 @@ def get_api_key(key_name: str, fallback_key_name: Optional[str] = None) -> str:
     )
 
 
-# Pydantic model for screening events
-class ScreeningEvent(BaseModel):
-    """Represents a cinema screening event."""
-    film_title: str = Field(description="The title of the film being screened")
-    showtime: str = Field(description="The time only (e.g., '2:50pm', '7:00 PM') extracted from raw_date_time")
-    is_special_event: bool = Field(description="Always true for Special Events page")
-    special_guest: Optional[str] = Field(default=None, description="Name of special guest if present (e.g., 'Sean Baker')")
-    format: Optional[str] = Field(default=None, description="Film format if special (e.g., '35mm', '70mm')")
-    notes: Optional[str] = Field(default=None, description="Additional notes or metadata about the event")
-    date: Optional[str] = Field(default=None, description="The specific date in YYYY-MM-DD format (e.g., '2026-01-17'). Parsed from raw_date_time.")
-    raw_date_time: Optional[str] = Field(default=None, description="The complete date and time string as it appears on the page (e.g., 'Saturday January 17, 2:50pm')")
+@dataclass(frozen=True)
+class Config:
+    """API keys and credentials, read from the environment once per run."""
+    firecrawl_key: str
+    openai_key: str
+    supabase_url: Optional[str] = None
+    supabase_key: Optional[str] = None
+
 
+_config: Optional[Config] = None
+
+
+def load_config() -> Config:
+    """
+    Read the configuration from the environment.
+    
+    Raises:
+        ValueError: If the Firecrawl or OpenAI key is missing
+    """
+    load_env_file()
+    return Config(
+        firecrawl_key=get_api_key("FIRECRAWL_API_KEY", "EXPO_PUBLIC_FIRECRAWL_API_KEY"),
+        # No fallback needed for OpenAI
+        openai_key=get_api_key("EXPO_PUBLIC_OPENAI_API_KEY"),
+        supabase_url=os.getenv("SUPABASE_URL"),
+        supabase_key=os.getenv("SUPABASE_SERVICE_ROLE_KEY"),
+    )
 
 
+def get_config() -> Config:
+    """Return the run configuration, loading it on first use."""
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
+
+
+# Lazily created API clients, shared by every scrape/analyze call in a run so
+# connection pools (and their TLS sessions) are reused. Async clients are
+# bound to the event loop they were first used on; close_async_clients()
+# resets them when that loop finishes.
+_firecrawl = None
+_openai: Optional["AsyncOpenAI"] = None
+_supabase: Optional["Client"] = None
+
+
+def get_firecrawl():
+    """Return the shared AsyncFirecrawl client."""
+    global _firecrawl
+    if _firecrawl is None:
+        api_key = get_config().firecrawl_key
+        from firecrawl import AsyncFirecrawl  # type: ignore[import-untyped]
+        _firecrawl = AsyncFirecrawl(api_key=api_key)
+    return _firecrawl
+
+
+def get_openai() -> "AsyncOpenAI":
+    """Return the shared AsyncOpenAI client."""
+    global _openai
+    if _openai is None:
+        api_key = get_config().openai_key
+        from openai import AsyncOpenAI
+        # Let the SDK manage its own connection pool
+        _openai = AsyncOpenAI(api_key=api_key)
+    return _openai
+
+
+def get_supabase() -> Optional["Client"]:
+    """Return the shared Supabase client, or None if no credentials are configured."""
+    global _supabase
+    config = get_config()
+    if _supabase is None and config.supabase_url and config.supabase_key:
+        from supabase import create_client
+        _supabase = create_client(config.supabase_url, config.supabase_key)
+    return _supabase
+
+
+async def close_async_clients() -> None:
+    """Close the shared async clients and reset them for the next event loop."""
+    global _firecrawl, _openai
+    if _openai is not None:
+        await _openai.close()
+    _firecrawl = None
+    _openai = None
+
+
+def use_uvloop() -> bool:
+    """Switch asyncio to the uvloop event loop when it is installed (not on Windows)."""
+    if uvloop is None or sys.platform == "win32":
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def run_async(coro):
+    """Run a coroutine to completion, closing the shared async clients afterwards."""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await close_async_clients()
+    return asyncio.run(runner())
+
 
 def scrape_calendar(url: str) -> str:
     """
     Scrape a calendar URL using Firecrawl and return the markdown content.
     
+    Sync wrapper around scrape_calendar_async().
+    
     Args:
         url: The URL to scrape
         
     Returns:
         The scraped content as markdown text
     """
-    # Get API key with fallback
-    api_key = get_api_key("FIRECRAWL_API_KEY", "EXPO_PUBLIC_FIRECRAWL_API_KEY")
+    return run_async(scrape_calendar_async(url))
+
+
+async def scrape_calendar_async(url: str) -> str:
+    """
+    Scrape a calendar URL using Firecrawl's async client without blocking the
+    event loop.
     
-    app = Firecrawl(api_key=api_key)
-    scrape_result = app.scrape(url, formats=['markdown'])
+    Args:
+        url: The URL to scrape
+        
+    Returns:
+        The scraped content as markdown text
+    """
+    scrape_result = await get_firecrawl().scrape(url, formats=['markdown'])
     
-    # Debug: Print the response type
-    print(f"\n🔍 Firecrawl Response Type: {type(scrape_result)}")
+    if DEBUG:
+        print(f"\n🔍 Firecrawl Response Type: {type(scrape_result)}")
     
-    # Handle Document object (Pydantic model) - can be a list or single object
-    if isinstance(scrape_result, list):
-        # Multiple documents returned
-        if len(scrape_result) == 0:
-            raise ValueError("Firecrawl returned an empty list of documents")
-        markdown_content = scrape_result[0].markdown
-    else:
-        # Single Document object
-        if hasattr(scrape_result, 'markdown'):
-            markdown_content = scrape_result.markdown
-        elif hasattr(scrape_result, 'content'):
-            markdown_content = scrape_result.content
-        else:
-            raise ValueError(f"Document object has no 'markdown' or 'content' attribute. Available attributes: {dir(scrape_result)}")
+    # Document object (Pydantic model) - can be a list or single object
+    docs = scrape_result if isinstance(scrape_result, list) else [scrape_result]
+    if not docs:
+        raise ValueError("Firecrawl returned an empty list of documents")
+    return extract_markdown(docs[0])
+
+
+def extract_markdown(doc) -> str:
+    """
+    Return the markdown text of a Firecrawl Document.
     
-    return markdown_content
+    Tries each attribute in MARKDOWN_ACCESSORS in order.
+    
+    Raises:
+        ValueError: If the document has none of them
+    """
+    for accessor in MARKDOWN_ACCESSORS:
+        value = getattr(doc, accessor, None)
+        if value:
+            return value
+    # dir() is slow, so only build the attribute list when actually failing
+    raise ValueError(
+        f"Document object has no {' or '.join(repr(a) for a in MARKDOWN_ACCESSORS)} attribute. "
+        f"Available attributes: {dir(doc)}"
+    )
 
 
 def detect_date_header(line: str, next_lines: List[str]) -> Optional[str]:
@@ -464,25 +651,117 @@ def is_special_event_strict(notes: Optional[str], special_guest: Optional[str])
     return True
 
 
-def analyze_with_openai(markdown_content: str) -> List[ScreeningEvent]:
+def prefilter_markdown(markdown_content: str) -> str:
     """
-    Use OpenAI to extract ScreeningEvent objects from the scraped markdown.
+    Keep only the parts of a page that can contain screening events.
+    
+    Keeps every line matching PREFILTER_LINE_RE plus PREFILTER_CONTEXT_LINES
+    lines of context on each side (titles and notes sit next to showtimes),
+    dropping navigation, footer and other boilerplate. Returns the input
+    unchanged if nothing matches.
     
     Args:
-        markdown_content: The scraped markdown text from the calendar
+        markdown_content: The scraped markdown text
         
     Returns:
-        A list of ScreeningEvent objects
+        The filtered markdown
+    """
+    lines = markdown_content.split("\n")
+    keep: Set[int] = set()
+    for i, line in enumerate(lines):
+        if PREFILTER_LINE_RE.search(line):
+            start = max(0, i - PREFILTER_CONTEXT_LINES)
+            keep.update(range(start, min(len(lines), i + PREFILTER_CONTEXT_LINES + 1)))
+    
+    if not keep:
+        return markdown_content
+    return "\n".join(lines[i] for i in sorted(keep))
+
+
+def normalize_markdown(markdown_content: str) -> str:
+    """
+    Normalize markdown for cache lookups.
+    
+    Collapses whitespace and drops blank lines so that pages which only differ
+    in formatting map to the same cache entry.
+    """
+    lines = (" ".join(line.split()) for line in markdown_content.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def get_cache_keys(markdown_content: str) -> List[str]:
     """
-    # Get API key (no fallback needed for OpenAI)
-    api_key = get_api_key("EXPO_PUBLIC_OPENAI_API_KEY")
+    Build the cache keys for a page: an exact content key, then a normalized one.
     
-    # Initialize the OpenAI client
-    client = OpenAI(api_key=api_key)
+    Both keys include both model names and the prompt version.
+    """
+    prefix = "|".join((OPENAI_MODEL, FORMATTER_MODEL, PROMPT_VERSION)) + "|"
+    return [
+        hashlib.sha256((prefix + markdown_content).encode()).hexdigest(),
+        hashlib.sha256((prefix + normalize_markdown(markdown_content)).encode()).hexdigest(),
+    ]
+
+
+def load_cached_events(cache_keys: List[str]) -> Optional[List[ScreeningEvent]]:
+    """
+    Return cached events for the first fresh cache entry found, or None on a miss.
     
-    # Processing the full page content
-    # Create the prompt for Special Events page
-    prompt = f"""Analyze the following Special Events page and extract all events.
+    Entries older than LLM_CACHE_TTL_SECONDS are ignored so calendar changes
+    are eventually re-queried.
+    """
+    now = time.time()
+    for key in cache_keys:
+        cache_path = LLM_CACHE_DIR / f"{key}.json"
+        try:
+            if now - cache_path.stat().st_mtime > LLM_CACHE_TTL_SECONDS:
+                continue
+            # Validate straight from bytes (no intermediate dict via json.load)
+            return EVENTS_RESPONSE_DECODER.decode(cache_path.read_bytes()).events
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def save_cached_events(cache_keys: List[str], events: List[ScreeningEvent]) -> None:
+    """Write events to the cache under every key. Failures are logged, not raised."""
+    payload = msgspec.json.encode(EventsResponse(events=events))
+    try:
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for key in cache_keys:
+            (LLM_CACHE_DIR / f"{key}.json").write_bytes(payload)
+    except OSError as e:
+        print(f"⚠️  Could not write LLM cache: {e}")
+
+
+# Prompt pieces, built once. Per call only the page/extracted text is
+# concatenated in between.
+EXTRACTION_SYSTEM_MESSAGE: "ChatCompletionMessageParam" = {
+    "role": "system",
+    "content": """You are a data extraction engine for Special Events pages.
+
+INSTRUCTIONS:
+1. **Extract ALL Events:** Read the entire page and extract every single event block.
+2. **Extract Fields:**
+   - film_title: The main title/heading of the event
+   - raw_date_time: The complete date and time string exactly as it appears (e.g., "Saturday January 17, 2:50pm")
+   - notes: The description/notes text if present
+   - special_guest: Any special guest name if mentioned
+   - format: Film format if mentioned (35mm, 70mm, etc.)
+3. **Special Events:**
+   - All events on this page are special events (is_special_event = true).
+4. **Output Format:**
+   - Plain text, one block per event, one labelled line per field.
+   - Extract the raw_date_time string exactly as shown on the page.
+   - The date field will be parsed separately in Python.
+
+MANDATORY:
+- Extract ALL events from the page.
+- Do not skip any events.
+- Preserve the raw_date_time string exactly as it appears.
+""",
+}
+
+EXTRACTION_PROMPT_PREFIX = """Analyze the following Special Events page and extract all events.
 
 Each event block typically contains:
 - Film title (the main heading)
@@ -504,85 +783,158 @@ For each event, extract:
 
 Here is the page content:
 
-{markdown_content}
+"""
+
+EXTRACTION_PROMPT_SUFFIX = """
 
-Extract all screening events and return them as a JSON array of ScreeningEvent objects."""
+List every screening event as plain text, one block per event, with each field on its own labelled line."""
 
-    # Use structured outputs with Pydantic model
-    # Create a wrapper model for the list since parse expects a single model
-    class EventsResponse(BaseModel):
-        events: List[ScreeningEvent]
+FORMATTING_PROMPT_PREFIX = "Convert this text into JSON matching the schema:\n\n"
+FORMATTING_PROMPT_SUFFIX = f"\n\nSchema: {EVENTS_RESPONSE_SCHEMA}"
+
+
+def analyze_with_openai(markdown_content: str, use_cache: bool = True) -> List[ScreeningEvent]:
+    """
+    Use OpenAI to extract ScreeningEvent objects from the scraped markdown.
     
-    print("⏳ Generating JSON (this may take a few seconds)...")
+    Sync wrapper around analyze_with_openai_async().
     
-    response = client.beta.chat.completions.parse(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": """You are a data extraction engine for Special Events pages.
+    Args:
+        markdown_content: The scraped markdown text from the calendar
+        use_cache: Whether to read from and write to the LLM result cache
+        
+    Returns:
+        A list of ScreeningEvent objects
+    """
+    return run_async(analyze_with_openai_async(markdown_content, use_cache=use_cache))
 
-INSTRUCTIONS:
-1. **Extract ALL Events:** Read the entire page and extract every single event block.
-2. **Extract Fields:**
-   - film_title: The main title/heading of the event
-   - raw_date_time: The complete date and time string exactly as it appears (e.g., "Saturday January 17, 2:50pm")
-   - notes: The description/notes text if present
-   - special_guest: Any special guest name if mentioned
-   - format: Film format if mentioned (35mm, 70mm, etc.)
-3. **Special Events:**
-   - All events on this page are special events (is_special_event = true).
-4. **Output Format:**
-   - Extract the raw_date_time string exactly as shown on the page.
-   - The date field will be parsed separately in Python.
 
-MANDATORY:
-- Extract ALL events from the page.
-- Do not skip any events.
-- Preserve the raw_date_time string exactly as it appears.
-"""
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
+async def analyze_with_openai_async(
+    markdown_content: str,
+    use_cache: bool = True,
+    event_queue: Optional["asyncio.Queue[Optional[ScreeningEvent]]"] = None,
+) -> List[ScreeningEvent]:
+    """
+    Use OpenAI to extract ScreeningEvent objects from the scraped markdown.
+    
+    Results are cached on disk by content hash, so an unchanged page does not
+    trigger another LLM call.
+    
+    The JSON stage is streamed: if event_queue is given, each event is put on
+    it as soon as it has been fully decoded, so consumers (e.g. the Supabase
+    upsert) can start before the completion finishes. Each distinct
+    (film_title, raw_date_time, showtime) among the returned events is queued
+    exactly once, even if streaming fails and a second completion is used.
+    
+    Args:
+        markdown_content: The scraped markdown text from the calendar
+        use_cache: Whether to read from and write to the LLM result cache
+        event_queue: Optional queue that receives events as they are decoded
+        
+    Returns:
+        A list of ScreeningEvent objects
+    """
+    # Trim the page to showtime-bearing sections before hashing/prompting
+    original_length = len(markdown_content)
+    markdown_content = prefilter_markdown(markdown_content)
+    print(f"✂️  Prefiltered markdown: {original_length} -> {len(markdown_content)} characters")
+    
+    cache_keys = get_cache_keys(markdown_content)
+    if use_cache:
+        cached_events = load_cached_events(cache_keys)
+        if cached_events is not None:
+            print(f"♻️  Using cached LLM result ({len(cached_events)} events)")
+            if event_queue is not None:
+                for event in cached_events:
+                    await event_queue.put(event)
+            return cached_events
+    
+    client = get_openai()
+    
+    # Stage 1: free-form extraction. No response_format here, so the model
+    # reasons about the page without also having to satisfy a JSON schema.
+    print("⏳ Extracting events (this may take a few seconds)...")
+    
+    extraction = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            EXTRACTION_SYSTEM_MESSAGE,
+            {"role": "user", "content": EXTRACTION_PROMPT_PREFIX + markdown_content + EXTRACTION_PROMPT_SUFFIX},
         ],
-        response_format=EventsResponse,
         temperature=0,
         timeout=300,
     )
+    extracted_text = extraction.choices[0].message.content
+    if not extracted_text:
+        raise ValueError("No content in extraction response")
+    
+    # Stage 2: mechanical conversion of the extracted text into the schema
+    print("⏳ Generating JSON...")
+    
+    formatting_messages: List["ChatCompletionMessageParam"] = [
+        {"role": "user", "content": FORMATTING_PROMPT_PREFIX + extracted_text + FORMATTING_PROMPT_SUFFIX}
+    ]
+    
+    # Identity of events already put on event_queue. Keyed rather than
+    # positional: a non-streaming retry is a separate sample and may return
+    # events in a different order. raw_date_time is part of the key so the
+    # same film at the same time on another day is still queued.
+    queued_keys: Set[Tuple[str, Optional[str], str]] = set()
+    
+    async def queue_event(event: ScreeningEvent) -> None:
+        key = (event.film_title, event.raw_date_time, event.showtime)
+        if event_queue is not None and key not in queued_keys:
+            queued_keys.add(key)
+            await event_queue.put(event)
+    
+    response: "ChatCompletion"
+    try:
+        async with client.beta.chat.completions.stream(
+            model=FORMATTER_MODEL,
+            messages=formatting_messages,
+            response_format=EVENTS_RESPONSE_FORMAT,
+            temperature=0,
+            timeout=300,
+        ) as stream:
+            buffer = ""
+            # Number of events of this stream already decoded
+            decoded_count = 0
+            async for chunk in stream:
+                if chunk.type != "content.delta":
+                    continue
+                buffer += chunk.delta
+                # An event can only have completed if this chunk closed an object
+                if event_queue is None or "}" not in chunk.delta:
+                    continue
+                try:
+                    partial = jiter.from_json(buffer.encode(), partial_mode="trailing-strings")
+                except ValueError:
+                    continue
+                partial_events = partial.get("events", []) if isinstance(partial, dict) else []
+                # The last event may still be incomplete; emit everything before it
+                for event_data in partial_events[decoded_count:-1]:
+                    await queue_event(msgspec.convert(event_data, ScreeningEvent))
+                    decoded_count += 1
+            response = await stream.get_final_completion()
+    except Exception as e:
+        print(f"⚠️  Streaming failed ({e}), retrying without streaming...")
+        response = await client.chat.completions.create(
+            model=FORMATTER_MODEL,
+            messages=formatting_messages,
+            response_format=EVENTS_RESPONSE_FORMAT,
+            temperature=0,
+            timeout=300,
+        )
     
     # Parse the response
     try:
-        parsed_content = response.choices[0].message.parsed
+        content_text = response.choices[0].message.content
+        if not content_text:
+            raise ValueError("No content in response")
         
-        # Extract events from the parsed response
-        if isinstance(parsed_content, EventsResponse):
-            events = parsed_content.events
-        elif isinstance(parsed_content, dict) and "events" in parsed_content:
-            events = [ScreeningEvent(**event) for event in parsed_content["events"]]
-        else:
-            # Fallback: try to parse from message content
-            content_text = response.choices[0].message.content
-            if content_text:
-                cleaned = content_text.strip()
-                if cleaned.startswith("```json"):
-                    cleaned = cleaned[7:]
-                if cleaned.startswith("```"):
-                    cleaned = cleaned[3:]
-                if cleaned.endswith("```"):
-                    cleaned = cleaned[:-3]
-                cleaned = cleaned.strip()
-                
-                events_data = json.loads(cleaned)
-                if isinstance(events_data, dict) and "events" in events_data:
-                    events = [ScreeningEvent(**event) for event in events_data["events"]]
-                elif isinstance(events_data, list):
-                    events = [ScreeningEvent(**event) for event in events_data]
-                else:
-                    events = [ScreeningEvent(**events_data)]
-            else:
-                raise ValueError("No content in response")
+        # Decode and type check the events straight from the response bytes
+        decoded = EVENTS_DECODER.decode(content_text.encode())
+        events = decoded.events if isinstance(decoded, EventsResponse) else decoded
         
         # Print the parsed response
         print("\n📊 Parsed Response:")
@@ -597,6 +949,12 @@ MANDATORY:
             if event.format:
                 print(f"  Format: {event.format}")
         
+        if use_cache:
+            save_cached_events(cache_keys, events)
+        
+        for event in events:
+            await queue_event(event)
+        
         return events
         
     except Exception as e:
@@ -606,149 +964,285 @@ MANDATORY:
         raise
 
 
-def main():
-    """Main execution function."""
-    print("🎬 Palit Scraper - Phase 1")
-    print("=" * 50)
+def build_event_row(event: ScreeningEvent, theater_name: str) -> dict:
+    """
+    Build the scraping_events row for one event.
     
-    # Debug: Check API keys
-    print("\n🔍 Environment Check:")
-    firecrawl_key = os.getenv("FIRECRAWL_API_KEY") or os.getenv("EXPO_PUBLIC_FIRECRAWL_API_KEY")
-    openai_key = os.getenv("EXPO_PUBLIC_OPENAI_API_KEY")
-    print(f"   Firecrawl Key Found: {'Yes ✅' if firecrawl_key else 'No ❌'}")
-    print(f"   OpenAI Key Found: {'Yes ✅' if openai_key else 'No ❌'}")
-    
-    if not firecrawl_key:
-        print("\n⚠️  Warning: Firecrawl API key not found!")
-        print("   Looking for: FIRECRAWL_API_KEY or EXPO_PUBLIC_FIRECRAWL_API_KEY")
-    if not openai_key:
-        print("\n⚠️  Warning: OpenAI API key not found!")
-        print("   Looking for: EXPO_PUBLIC_OPENAI_API_KEY")
-    
-    # Step 1: Scrape the Special Events page
-    print("\n📡 Scraping Metrograph Special Events page...")
-    url = "https://metrograph.com/events/"
+    Splits raw_date_time into an ISO date and a showtime where possible.
     
-    try:
-        markdown_content = scrape_calendar(url)
-        print(f"✅ Successfully scraped {len(markdown_content)} characters")
+    Args:
+        event: The extracted event
+        theater_name: Theater the event belongs to
         
-    except Exception as e:
-        print(f"❌ Error scraping URL: {e}")
-        return
+    Returns:
+        A dict ready for upsert
+    """
+    # All events on Special Events page are special events
+    print(f"✅ Saving Special Event: {event.film_title}")
+    
+    # Parse raw_date_time into date and time
+    date_iso = None
+    showtime = event.showtime  # Default to AI-extracted showtime
+    
+    # Parse date and time from raw_date_time if available
+    raw_date_time = getattr(event, 'raw_date_time', None)
+    if raw_date_time:
+        # Example formats: "Saturday January 17, 2:50pm", "Friday, January 16, 7:00 PM"
+        # Extract date part (before the comma + time)
+        # Try to split on comma before time
+        date_time_match = re.search(r'([A-Za-z]+(?:\s+[A-Za-z]+)?\s+\d{1,2}(?:st|nd|rd|th)?)\s*,\s*([\d:]+(?:\s*[ap]m)?)', raw_date_time, re.IGNORECASE)
+        if date_time_match:
+            date_part = date_time_match.group(1)  # e.g., "Saturday January 17th"
+            time_part = date_time_match.group(2)  # e.g., "2:50pm"
+            # Parse date to ISO format
+            date_iso = parse_date_to_iso(date_part)
+            # Use extracted time as showtime
+            showtime = time_part.strip()
+        else:
+            # Fallback: try to extract date from raw_date_time string
+            date_iso = parse_date_to_iso(raw_date_time)
+            # If we can't split cleanly, try to extract just the time
+            time_match = re.search(r'([\d:]+(?:\s*[ap]m)?)', raw_date_time, re.IGNORECASE)
+            if time_match:
+                showtime = time_match.group(1).strip()
+    
+    # Priority: Use event.date if AI already extracted it
+    if hasattr(event, 'date') and event.date:
+        date_iso = event.date
+        print(f"   (Date from AI: {date_iso})")
+    elif date_iso:
+        print(f"   (Date parsed from raw_date_time: {date_iso})")
+    
+    if showtime:
+        print(f"   (Showtime: {showtime})")
+    
+    event_dict = {
+        "film_title": event.film_title,
+        "showtime": showtime or event.showtime,  # Use parsed time or fallback to AI showtime
+        "theater_name": theater_name,
+        "is_special_event": True,  # All events on Special Events page are special
+        "special_guest": event.special_guest,
+        "format": event.format,
+    }
     
-    # Use the raw markdown content directly (no preprocessing needed for Special Events page)
-    processed_text = markdown_content
+    # Add date field (ISO format for Supabase DATE column). Always present,
+    # even if unparsed, since it is part of the upsert conflict key.
+    event_dict["date"] = date_iso
     
-    # Step 3: Analyze with OpenAI
-    print("\n🤖 Analyzing content with OpenAI...")
-    try:
-        events = analyze_with_openai(processed_text)
-        print(f"✅ Extracted {len(events)} screening events")
-    except Exception as e:
-        print(f"❌ Error analyzing content: {e}")
-        return
+    # Add notes field if present
+    notes = getattr(event, 'notes', None)
+    if notes:
+        event_dict["notes"] = notes
     
-    # Step 3: Output results
-    print("\n📋 Results:")
-    print("=" * 50)
+    return event_dict
+
+
+def save_events_to_supabase(supabase: "Client", theater_name: str, events: List[ScreeningEvent]) -> None:
+    """
+    Upsert a theater's events into the scraping_events table.
     
-    # Convert to JSON for output
-    events_json = [event.model_dump() for event in events]
-    print(json.dumps(events_json, indent=2, ensure_ascii=False))
+    Rows are sent in bulk (one request per SUPABASE_UPSERT_BATCH_SIZE rows),
+    never one request per event. The on_conflict columns must be covered by a
+    unique index on (film_title, date, showtime, theater_name) (see README).
+    Rows that collide on those columns describe the same screening and are
+    collapsed, keeping the last one, since Postgres rejects an upsert that
+    touches the same row twice. Each collapsed row is logged.
     
-    # Summary
-    special_events = [e for e in events if e.is_special_event]
-    print(f"\n✨ Found {len(special_events)} special events out of {len(events)} total screenings")
+    Args:
+        supabase: Supabase client
+        theater_name: Theater the events belong to
+        events: Events extracted for that theater
+    """
+    # Prepare data for upsert (all events on Special Events page are special events)
+    rows: Dict[Tuple[Optional[str], ...], dict] = {}
+    for event in events:
+        row = build_event_row(event, theater_name)
+        key = tuple(row[column] for column in SUPABASE_CONFLICT_COLUMNS)
+        if key in rows:
+            print(f"⚠️  Duplicate screening in batch, keeping the later row: {key}")
+        rows[key] = row
+    events_data = list(rows.values())
+    
+    # Upsert to Supabase
+    for start in range(0, len(events_data), SUPABASE_UPSERT_BATCH_SIZE):
+        supabase.table("scraping_events").upsert(
+            events_data[start:start + SUPABASE_UPSERT_BATCH_SIZE],
+            on_conflict=", ".join(SUPABASE_CONFLICT_COLUMNS)
+        ).execute()
     
-    # Step 4: Save to Supabase
-    print("\n💾 Saving to Supabase...")
-    try:
-        # Initialize Supabase client
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("⚠️  Warning: Supabase credentials not found. Skipping database save.")
-            print("   Looking for: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+    print(f"✅ Successfully saved {len(events_data)} {theater_name} events to Supabase!")
+
+
+async def save_events_from_queue(
+    supabase: "Client",
+    theater_name: str,
+    event_queue: "asyncio.Queue[Optional[ScreeningEvent]]",
+) -> None:
+    """
+    Upsert events from a queue in batches of SUPABASE_STREAM_BATCH_SIZE.
+    
+    Runs until it receives None. The sync Supabase client is called in a worker
+    thread so it does not block the event loop.
+    
+    Args:
+        supabase: Supabase client
+        theater_name: Theater the events belong to
+        event_queue: Queue of events, terminated by None
+    """
+    batch: List[ScreeningEvent] = []
+    while True:
+        event = await event_queue.get()
+        if event is not None:
+            batch.append(event)
+        if batch and (event is None or len(batch) >= SUPABASE_STREAM_BATCH_SIZE):
+            await asyncio.to_thread(save_events_to_supabase, supabase, theater_name, batch)
+            batch = []
+        if event is None:
             return
+
+
+async def process_theater(
+    theater_name: str,
+    url: str,
+    semaphore: asyncio.Semaphore,
+    use_cache: bool = True,
+    supabase: Optional["Client"] = None,
+) -> Optional[List[ScreeningEvent]]:
+    """
+    Scrape and analyze one theater's Special Events page.
+    
+    If a Supabase client is given, events are saved while the OpenAI response
+    is still streaming.
+    
+    Args:
+        theater_name: Theater name (used for logging)
+        url: Special Events page URL
+        semaphore: Bounds how many theaters are processed at once
+        use_cache: Whether to use the LLM result cache
+        supabase: Optional Supabase client to save events to
         
-        supabase: Client = create_client(supabase_url, supabase_key)
+    Returns:
+        The extracted events, or None if scraping or analysis failed
+    """
+    async with semaphore:
+        # Step 1: Scrape the Special Events page
+        print(f"\n📡 Scraping {theater_name} Special Events page...")
+        try:
+            markdown_content = await scrape_calendar_async(url)
+            print(f"✅ Successfully scraped {len(markdown_content)} characters from {theater_name}")
+        except Exception as e:
+            print(f"❌ Error scraping {url}: {e}")
+            return None
         
-        # Prepare data for upsert (all events on Special Events page are special events)
-        events_data = []
-        for event in events:
-            # All events on Special Events page are special events
-            print(f"✅ Saving Special Event: {event.film_title}")
-            
-            # Parse raw_date_time into date and time
-            date_iso = None
-            showtime = event.showtime  # Default to AI-extracted showtime
-            
-            # Parse date and time from raw_date_time if available
-            raw_date_time = getattr(event, 'raw_date_time', None)
-            if raw_date_time:
-                # Example formats: "Saturday January 17, 2:50pm", "Friday, January 16, 7:00 PM"
-                # Extract date part (before the comma + time)
-                # Try to split on comma before time
-                date_time_match = re.search(r'([A-Za-z]+(?:\s+[A-Za-z]+)?\s+\d{1,2}(?:st|nd|rd|th)?)\s*,\s*([\d:]+(?:\s*[ap]m)?)', raw_date_time, re.IGNORECASE)
-                if date_time_match:
-                    date_part = date_time_match.group(1)  # e.g., "Saturday January 17th"
-                    time_part = date_time_match.group(2)  # e.g., "2:50pm"
-                    # Parse date to ISO format
-                    date_iso = parse_date_to_iso(date_part)
-                    # Use extracted time as showtime
-                    showtime = time_part.strip()
-                else:
-                    # Fallback: try to extract date from raw_date_time string
-                    date_iso = parse_date_to_iso(raw_date_time)
-                    # If we can't split cleanly, try to extract just the time
-                    time_match = re.search(r'([\d:]+(?:\s*[ap]m)?)', raw_date_time, re.IGNORECASE)
-                    if time_match:
-                        showtime = time_match.group(1).strip()
-            
-            # Priority: Use event.date if AI already extracted it
-            if hasattr(event, 'date') and event.date:
-                date_iso = event.date
-                print(f"   (Date from AI: {date_iso})")
-            elif date_iso:
-                print(f"   (Date parsed from raw_date_time: {date_iso})")
-            
-            if showtime:
-                print(f"   (Showtime: {showtime})")
-            
-            event_dict = {
-                "film_title": event.film_title,
-                "showtime": showtime or event.showtime,  # Use parsed time or fallback to AI showtime
-                "theater_name": THEATER_NAME,
-                "is_special_event": True,  # All events on Special Events page are special
-                "special_guest": event.special_guest,
-                "format": event.format,
-            }
-            
-            # Add date field (ISO format for Supabase DATE column)
-            if date_iso:
-                event_dict["date"] = date_iso
-            
-            # Add notes field if present
-            notes = getattr(event, 'notes', None)
-            if notes:
-                event_dict["notes"] = notes
-            
-            events_data.append(event_dict)
-        
-        # Upsert to Supabase
-        result = supabase.table("scraping_events").upsert(
-            events_data,
-            on_conflict="film_title, showtime, theater_name"
-        ).execute()
+        # Steps 2-3: Analyze with OpenAI, saving events to Supabase as they arrive
+        event_queue: Optional["asyncio.Queue[Optional[ScreeningEvent]]"] = None
+        save_task = None
+        if supabase is not None:
+            event_queue = asyncio.Queue()
+            save_task = asyncio.create_task(save_events_from_queue(supabase, theater_name, event_queue))
+        
+        print(f"\n🤖 Analyzing {theater_name} content with OpenAI...")
+        events: Optional[List[ScreeningEvent]]
+        try:
+            events = await analyze_with_openai_async(markdown_content, use_cache=use_cache, event_queue=event_queue)
+            print(f"✅ Extracted {len(events)} screening events from {theater_name}")
+        except Exception as e:
+            print(f"❌ Error analyzing {theater_name} content: {e}")
+            events = None
+        finally:
+            if event_queue is not None:
+                await event_queue.put(None)
         
-        print(f"✅ Successfully saved {len(events_data)} events to Supabase!")
+        if save_task is not None:
+            try:
+                await save_task
+            except Exception as e:
+                print(f"❌ Error saving {theater_name} to Supabase: {e}")
+                import traceback
+                traceback.print_exc()
         
+        return events
+
+
+async def main_async(
+    args: argparse.Namespace,
+    supabase: Optional["Client"] = None,
+) -> List[Tuple[str, Optional[List[ScreeningEvent]]]]:
+    """
+    Process all THEATERS concurrently, at most MAX_CONCURRENCY at a time.
+    
+    Returns:
+        (theater_name, events) pairs in THEATERS order; events is None on failure
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    all_events = await asyncio.gather(*(
+        process_theater(name, url, semaphore, use_cache=not args.no_cache, supabase=supabase)
+        for name, url in THEATERS
+    ))
+    return [(name, events) for (name, _), events in zip(THEATERS, all_events)]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Palit Scraper - Phase 1")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call OpenAI instead of reusing cached results",
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    
+    print("🎬 Palit Scraper - Phase 1")
+    print("=" * 50)
+    
+    # Check API keys once, before any network work
+    print("\n🔍 Environment Check:")
+    try:
+        get_config()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    print("   Firecrawl Key Found: Yes ✅")
+    print("   OpenAI Key Found: Yes ✅")
+    
+    # Supabase client (events are saved as they are extracted)
+    supabase = None
+    try:
+        supabase = get_supabase()
     except Exception as e:
-        print(f"❌ Error saving to Supabase: {e}")
+        print(f"❌ Error connecting to Supabase: {e}")
         import traceback
         traceback.print_exc()
+    else:
+        if supabase is None:
+            print("\n⚠️  Warning: Supabase credentials not found. Skipping database save.")
+            print("   Looking for: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+    
+    # Steps 1-3: Scrape, analyze and save every theater concurrently
+    if use_uvloop():
+        print("\n⚡ Using uvloop event loop")
+    results = run_async(main_async(args, supabase))
+    
+    # Step 4: Output results
+    for theater_name, events in results:
+        if events is None:
+            continue
+        
+        print(f"\n📋 Results ({theater_name}):")
+        print("=" * 50)
+        
+        # Convert to JSON for output
+        events_json = msgspec.to_builtins(events)
+        print(json.dumps(events_json, indent=2, ensure_ascii=False))
+        
+        # Summary
+        special_events = [e for e in events if e.is_special_event]
+        print(f"\n✨ Found {len(special_events)} special events out of {len(events)} total screenings")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""
+Palit Scraper - event models
+msgspec models for screening events and the decoders/JSON schema built from them.
+
+Kept out of main.py so they stay pure Python in the optional mypyc build:
+msgspec cannot decode into Struct classes that mypyc has compiled.
+"""
+
+import json
+from typing import TYPE_CHECKING, Annotated, List, Optional, Union
+import msgspec
+
+if TYPE_CHECKING:
+    from openai.types.shared_params import ResponseFormatJSONSchema
+
+
+# msgspec model for screening events
+class ScreeningEvent(msgspec.Struct):
+    """Represents a cinema screening event."""
+    film_title: Annotated[str, msgspec.Meta(description="The title of the film being screened")]
+    showtime: Annotated[str, msgspec.Meta(description="The time only (e.g., '2:50pm', '7:00 PM') extracted from raw_date_time")]
+    is_special_event: Annotated[bool, msgspec.Meta(description="Always true for Special Events page")]
+    special_guest: Annotated[Optional[str], msgspec.Meta(description="Name of special guest if present (e.g., 'Sean Baker')")] = None
+    format: Annotated[Optional[str], msgspec.Meta(description="Film format if special (e.g., '35mm', '70mm')")] = None
+    notes: Annotated[Optional[str], msgspec.Meta(description="Additional notes or metadata about the event")] = None
+    date: Annotated[Optional[str], msgspec.Meta(description="The specific date in YYYY-MM-DD format (e.g., '2026-01-17'). Parsed from raw_date_time.")] = None
+    raw_date_time: Annotated[Optional[str], msgspec.Meta(description="The complete date and time string as it appears on the page (e.g., 'Saturday January 17, 2:50pm')")] = None
+
+
+# Wrapper for structured outputs, since the response must be a single object
+class EventsResponse(msgspec.Struct):
+    """List of screening events returned by OpenAI."""
+    events: List[ScreeningEvent]
+
+
+def strict_json_schema(struct_type: type) -> dict:
+    """
+    Build an OpenAI strict-mode JSON schema for a msgspec Struct.
+    
+    Strict mode needs an object at the root, every property listed in
+    "required" (optional fields stay nullable) and no additional properties.
+    
+    Args:
+        struct_type: The msgspec Struct to describe
+        
+    Returns:
+        The JSON schema as a dict
+    """
+    schema = msgspec.json.schema(struct_type)
+    defs = schema.pop("$defs", {})
+    for definition in defs.values():
+        if definition.get("type") == "object":
+            definition["required"] = list(definition["properties"])
+            definition["additionalProperties"] = False
+            for prop in definition["properties"].values():
+                prop.pop("default", None)
+    
+    # msgspec puts the root type behind a $ref; OpenAI wants it inline
+    root = defs.pop(schema["$ref"].rsplit("/", 1)[-1])
+    if defs:
+        root["$defs"] = defs
+    return root
+
+
+# Structured-output request format, and its schema as text for the
+# formatting prompt (both built once at import)
+EVENTS_RESPONSE_JSON_SCHEMA = strict_json_schema(EventsResponse)
+EVENTS_RESPONSE_FORMAT: "ResponseFormatJSONSchema" = {
+    "type": "json_schema",
+    "json_schema": {"name": "events", "schema": EVENTS_RESPONSE_JSON_SCHEMA, "strict": True},
+}
+EVENTS_RESPONSE_SCHEMA = json.dumps(EVENTS_RESPONSE_JSON_SCHEMA)
+
+# Decode + type check in one pass. The response decoder also accepts a bare
+# list of events in case the model drops the wrapper object.
+EVENTS_RESPONSE_DECODER = msgspec.json.Decoder(EventsResponse)
+EVENTS_DECODER = msgspec.json.Decoder(Union[EventsResponse, List[ScreeningEvent]])
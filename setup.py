@@ -0,0 +1,22 @@
+"""
+Optional mypyc build: compiles main.py into a C extension.
+
+    pip install "mypy[mypyc]"
+    python setup.py build_ext --inplace
+    python -c "import main; main.main()"
+
+`python main.py` always runs the pure-Python source; the compiled module is
+used when `main` is imported. Delete main.*.so to go back to pure Python.
+
+models.py must stay out of mypycify(): msgspec cannot decode into Struct
+classes compiled by mypyc. See the README for a post-build smoke check.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="palit-scraper",
+    py_modules=[],
+    ext_modules=mypycify(["main.py"]),
+)